@@ -0,0 +1,109 @@
+import asyncio
+import logging
+
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+class AsyncBatcher:
+    """
+    Coalesces concurrent Google API calls for the same document into a single HTTP round trip.
+
+    Operations are queued per (document_id, api):
+      - "docs": a list of Docs API requests. Queued lists are concatenated, in submission order, into
+        one documents.batchUpdate call, which applies them exactly as if the calls had run one after
+        another. Each caller receives the slice of 'replies' for its own requests.
+      - "drive": a googleapiclient HttpRequest. Queued requests are sent through Drive's
+        multipart batch endpoint and each caller receives its own response.
+
+    A queue is flushed max_wait_ms after its first operation arrives, or as soon as it holds max_batch operations.
+    """
+
+    def __init__(self, docs_service, max_wait_ms: float = 20, max_batch: int = 50):
+        self.docs_service = docs_service
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max_batch
+        self._pending: dict[tuple[str, str], list[tuple[object, asyncio.Future]]] = {}
+        self._timers: dict[tuple[str, str], asyncio.TimerHandle] = {}
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, document_id: str, api: str, op):
+        """Queues an operation and waits for the result of the batch it ends up in."""
+        if api not in ("docs", "drive"):
+            raise ValueError(f"Unknown api: {api}")
+        loop = asyncio.get_running_loop()
+        key = (document_id, api)
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((op, future))
+        if len(pending) >= self.max_batch:
+            self._start_flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._start_flush, key)
+        return await future
+
+    def _start_flush(self, key: tuple[str, str]):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        document_id, api = key
+        if api == "docs":
+            task = asyncio.create_task(self._flush_docs(document_id, batch))
+        else:
+            task = asyncio.create_task(self._flush_drive(document_id, batch))
+        # Keep a reference so the flush isn't garbage collected mid-flight.
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush_docs(self, document_id: str, batch: list):
+        requests = [request for op, _ in batch for request in op]
+        try:
+            result = await self.docs_service.edit_document(document_id, requests)
+        except Exception as e:
+            # Only a 400 means Docs rejected the batch as invalid. batchUpdate is atomic, so then one
+            # invalid op rejected the whole batch and nothing was applied. Any other failure (e.g. a
+            # 429 or 5xx) is shared by every caller: after a 5xx the batch may already have been
+            # applied, and replaying could apply the ops twice.
+            if not isinstance(e, HttpError) or e.resp.status != 400 or len(batch) == 1:
+                for _, future in batch:
+                    _set_exception(future, e)
+                return
+            # Replay each caller's ops on their own so only the offending caller sees the error.
+            logger.info(f"Batched update of document {document_id} failed, replaying {len(batch)} ops individually")
+            for op, future in batch:
+                try:
+                    _set_result(future, await self.docs_service.edit_document(document_id, op))
+                except Exception as op_error:
+                    _set_exception(future, op_error)
+            return
+        replies = result.get("replies", [])
+        start = 0
+        for op, future in batch:
+            end = start + len(op)
+            _set_result(future, {**result, "replies": replies[start:end]})
+            start = end
+
+    async def _flush_drive(self, document_id: str, batch: list):
+        try:
+            responses = await self.docs_service.execute_drive_batch([op for op, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                _set_exception(future, e)
+            return
+        for (_, future), response in zip(batch, responses):
+            if isinstance(response, Exception):
+                _set_exception(future, response)
+            else:
+                _set_result(future, response)
+
+def _set_result(future: asyncio.Future, result):
+    # The caller may have been cancelled while its op was in flight.
+    if not future.done():
+        future.set_result(result)
+
+def _set_exception(future: asyncio.Future, exception: BaseException):
+    if not future.done():
+        future.set_exception(exception)
@@ -0,0 +1,31 @@
+import time
+
+# How long a document snapshot may be served from the cache, in seconds.
+DOC_CACHE_TTL = 30
+
+class DocCache:
+    """
+    Short-lived cache of document snapshots (documents.get responses), keyed by document ID.
+    Entries expire after `ttl` seconds and should be invalidated whenever the document is edited.
+    """
+
+    def __init__(self, ttl: float = DOC_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: dict[str, tuple[float, dict]] = {}
+
+    def get(self, document_id: str) -> dict | None:
+        """Returns the cached snapshot of the document, or None if there is no fresh one."""
+        entry = self._entries.get(document_id)
+        if entry is None:
+            return None
+        expires_at, doc = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[document_id]
+            return None
+        return doc
+
+    def put(self, document_id: str, doc: dict):
+        self._entries[document_id] = (time.monotonic() + self.ttl, doc)
+
+    def invalidate(self, document_id: str):
+        self._entries.pop(document_id, None)
@@ -1,15 +1,110 @@
 import os
 import asyncio
+import functools
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from mcp_server.doc_cache import DocCache
+from mcp_server.rate_limiter import AsyncTokenBucket, rate_limited, retry_after_seconds
+from mcp_server.retry import MAX_ATTEMPTS, backoff_delay, is_idempotent, is_retryable, with_retry
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where the token file isn't locked.
+    fcntl = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Maximum number of calls Drive accepts in a single batch request.
+DRIVE_BATCH_LIMIT = 100
+
+# Client-side rate limits (calls per second), matching Google's published per-user quotas:
+# Docs allows 300 reads and 60 writes per minute, Drive 1000 queries per 100 seconds.
+DOCS_READ_RATE = 300 / 60
+DOCS_WRITE_RATE = 60 / 60
+DRIVE_RATE = 1000 / 100
+
+# Maximum number of Google API calls in flight at once; also the number of threads dedicated to
+# blocking googleapiclient calls. asyncio's default executor is sized from the CPU count (as few as
+# 5 threads), which caps how many network-bound calls can be in flight.
+API_MAX_CONCURRENCY = 16
+
+# Partial-response mask for reading a document's text. Styles and layout make up most of a full
+# documents.get response; this keeps only the text plus what rewrite_document needs from a
+# cached snapshot (the revision and the end index of the body).
+TEXT_FIELDS = "documentId,revisionId,body(content(endIndex,paragraph(elements(textRun(content)))))"
+
+async def gather_calls(*coros):
+    """
+    Runs independent Google API calls concurrently and returns their results in order.
+    If any call fails, the remaining ones are cancelled and the first error is raised.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+def replace_text_requests(search_text: str, replacement: str, match_case: bool = True) -> list:
+    """Builds the batchUpdate request that replaces every occurrence of 'search_text' with 'replacement'."""
+    return [{
+        "replaceAllText": {
+            "containsText": {"text": search_text, "matchCase": match_case},
+            "replaceText": replacement
+        }
+    }]
+
+def insert_texts_requests(insertions: list[tuple[int, str]]) -> list:
+    """
+    Builds the batchUpdate requests that insert each (index, text) pair, where every index refers
+    to the document as it is before any of the inserts. They are applied from the highest index
+    down so no insert shifts the position of another; texts at the same index keep their order.
+    Empty texts are skipped.
+    """
+    ordered = sorted(enumerate(insertions), key=lambda item: (item[1][0], item[0]), reverse=True)
+    return [
+        {"insertText": {"location": {"index": index}, "text": text}}
+        for _, (index, text) in ordered
+        if text
+    ]
+
+@contextmanager
+def _token_file_lock(token_path: str):
+    """Holds an exclusive lock (on a sidecar '.lock' file) while the token file is refreshed and rewritten."""
+    if fcntl is None:
+        yield
+        return
+    with open(token_path + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+@functools.cache
+def discovery_document(service_name: str, version: str) -> str:
+    """
+    Returns the discovery document bundled with googleapiclient for the given API, as JSON text.
+    It is read from disk once per process. The text rather than the parsed dict is cached, since
+    the client built from a document writes into it; build_from_document parses a fresh copy for
+    every client.
+    """
+    return get_static_doc(service_name, version)
+
 class GoogleDocsService:
     def __init__(self, creds_file_path: str, token_path: str, scopes: list[str] = None):
         # Default scopes include both Docs and Drive.
@@ -19,18 +114,47 @@ class GoogleDocsService:
                 'https://www.googleapis.com/auth/drive'
             ]
         self.creds = self._get_credentials(creds_file_path, token_path, scopes)
-        # Initialize the Docs API client.
-        self.docs_service = build('docs', 'v1', credentials=self.creds)
-        # Initialize the Drive API client (for sharing, comments, etc).
-        self.drive_service = build('drive', 'v3', credentials=self.creds)
+        # The Docs and Drive API clients are built on first use (see docs_service and drive_service).
+        # Token buckets that keep us under the quotas instead of running into 429 backoffs.
+        self.docs_read_bucket = AsyncTokenBucket(rate=DOCS_READ_RATE, capacity=30)
+        self.docs_write_bucket = AsyncTokenBucket(rate=DOCS_WRITE_RATE, capacity=10)
+        self.drive_bucket = AsyncTokenBucket(rate=DRIVE_RATE, capacity=100)
+        self._executor = ThreadPoolExecutor(max_workers=API_MAX_CONCURRENCY, thread_name_prefix="google-api")
+        # Calls beyond the limit wait on the event loop instead of queueing up connections to Google.
+        self._api_semaphore = asyncio.Semaphore(API_MAX_CONCURRENCY)
+        # One authorized HTTP client per worker thread (see _http).
+        self._local = threading.local()
+        self._https: list[AuthorizedHttp] = []
+        self._https_lock = threading.Lock()
+        # Recent documents.get responses, so a rewrite right after a read doesn't fetch the doc again.
+        self.doc_cache = DocCache()
         logger.info("Google Docs and Drive services initialized.")
 
+    @functools.cached_property
+    def docs_service(self):
+        """The Docs API client, built from the discovery document bundled with googleapiclient."""
+        return build_from_document(discovery_document('docs', 'v1'), credentials=self.creds)
+
+    @functools.cached_property
+    def drive_service(self):
+        """
+        The Drive API client (for sharing, comments, etc). Drive's discovery document is the larger
+        of the two, so a session that only edits documents never pays for parsing it.
+        """
+        return build_from_document(discovery_document('drive', 'v3'), credentials=self.creds)
+
     def _get_credentials(self, creds_file_path: str, token_path: str, scopes: list[str]) -> Credentials:
-        creds = None
-        if os.path.exists(token_path):
-            logger.info('Loading token from file.')
-            creds = Credentials.from_authorized_user_file(token_path, scopes)
-        if not creds or not creds.valid:
+        creds = self._load_token(token_path, scopes)
+        if creds:
+            logger.info('Loaded token from file.')
+        if creds and creds.valid:
+            return creds
+        # Several processes (e.g. pytest-xdist workers) may share the token file. Only one of them
+        # refreshes it at a time; the others wait and then pick up the token it saved.
+        with _token_file_lock(token_path):
+            creds = self._load_token(token_path, scopes)
+            if creds and creds.valid:
+                return creds
             if creds and creds.expired and creds.refresh_token:
                 logger.info('Refreshing token.')
                 creds.refresh(Request())
@@ -38,21 +162,83 @@ class GoogleDocsService:
                 logger.info('Fetching new token.')
                 flow = InstalledAppFlow.from_client_secrets_file(creds_file_path, scopes)
                 creds = flow.run_local_server(port=0)
-            with open(token_path, 'w') as token_file:
-                token_file.write(creds.to_json())
-                logger.info(f'Token saved to {token_path}')
+            # Write to a temporary file and rename it over the token, so no process ever reads a partial file.
+            tmp_path = f"{token_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, 'w') as token_file:
+                    token_file.write(creds.to_json())
+                os.replace(tmp_path, token_path)
+            except BaseException:
+                # Don't leave a partly written temporary file behind next to the token.
+                try:
+                    os.remove(tmp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+            logger.info(f'Token saved to {token_path}')
         return creds
 
+    def _load_token(self, token_path: str, scopes: list[str]) -> Credentials | None:
+        if not os.path.exists(token_path):
+            return None
+        return Credentials.from_authorized_user_file(token_path, scopes)
+
+    def close(self):
+        """Releases the worker threads and their open connections. Call once the service is no longer used."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._https_lock:
+            https, self._https = self._https, []
+        for http in https:
+            http.close()
+
+    def _http(self) -> AuthorizedHttp:
+        """
+        Returns the calling worker thread's authorized HTTP client, creating it on first use.
+        httplib2.Http isn't thread-safe, so each worker keeps its own; it holds its connections
+        to Google open, so later calls on the same thread skip the TCP and TLS handshakes.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.creds, http=build_http())
+            self._local.http = http
+            with self._https_lock:
+                self._https.append(http)
+        return http
+
+    def _call_with_http(self, fn, *args, **kwargs):
+        return fn(*args, http=self._http(), **kwargs)
+
+    async def _run_blocking(self, fn, *args, **kwargs):
+        """
+        Runs a blocking googleapiclient call (an HttpRequest's or BatchHttpRequest's execute)
+        on the service's own worker threads, using that thread's HTTP client.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._api_semaphore:
+            return await loop.run_in_executor(
+                self._executor, functools.partial(self._call_with_http, fn, *args, **kwargs)
+            )
+
+    async def _execute(self, request, bucket: AsyncTokenBucket):
+        """
+        Executes a googleapiclient request off the event loop, once the quota bucket admits it.
+        Transient failures are retried with backoff, taking a new token for each attempt; writes
+        that aren't idempotent (creates, batchUpdates) are only retried after a 429.
+        """
+        async def _attempt():
+            async with rate_limited(bucket):
+                return await self._run_blocking(request.execute)
+        return await with_retry(_attempt, idempotent=is_idempotent(request))
+
     async def create_document(self, title: str = "New Document", org: str = None, role: str = "writer") -> dict:
         """
         Creates a new Google Doc with the given title.
         If 'org' is provided (e.g., "example.com"), the document will be shared with everyone in that domain,
         using the specified role (default is "writer").
         """
-        def _create():
-            body = {'title': title}
-            return self.docs_service.documents().create(body=body).execute()
-        doc = await asyncio.to_thread(_create)
+        body = {'title': title}
+        request = self.docs_service.documents().create(body=body)
+        doc = await self._execute(request, self.docs_write_bucket)
         document_id = doc.get('documentId')
         logger.info(f"Created document with ID: {document_id}")
 
@@ -72,35 +258,62 @@ class GoogleDocsService:
         Returns:
             dict: The response from the Drive API.
         """
-        def _share():
-            permission_body = {
-                'type': 'domain',
-                'role': role,
-                'domain': domain
-            }
-            return self.drive_service.permissions().create(
-                fileId=document_id,
-                body=permission_body,
-                fields='id'
-            ).execute()
-        result = await asyncio.to_thread(_share)
+        permission_body = {
+            'type': 'domain',
+            'role': role,
+            'domain': domain
+        }
+        request = self.drive_service.permissions().create(
+            fileId=document_id,
+            body=permission_body,
+            fields='id'
+        )
+        result = await self._execute(request, self.drive_bucket)
         logger.info(f"Shared document {document_id} with organization domain: {domain}")
         return result
 
-    async def edit_document(self, document_id: str, requests: list) -> dict:
-        """Edits a document using a batchUpdate request."""
-        def _update():
-            body = {'requests': requests}
-            return self.docs_service.documents().batchUpdate(documentId=document_id, body=body).execute()
-        result = await asyncio.to_thread(_update)
-        logger.info(f"Updated document {document_id}: {result}")
+    async def list_permissions(self, document_id: str) -> list:
+        """Lists who the document is shared with using the Drive API."""
+        request = self.drive_service.permissions().list(
+            fileId=document_id,
+            fields="permissions(id,domain,role,type)"
+        )
+        response = await self._execute(request, self.drive_bucket)
+        return response.get('permissions', [])
+
+    async def delete_document(self, document_id: str) -> dict:
+        """Permanently deletes the document (skipping the trash) using the Drive API."""
+        request = self.drive_service.files().delete(fileId=document_id)
+        result = await self._execute(request, self.drive_bucket)
+        logger.info(f"Deleted document {document_id}")
+        return result
+
+    async def edit_document(self, document_id: str, requests: list, write_control: dict = None) -> dict:
+        """
+        Edits a document using a batchUpdate request.
+        If 'write_control' is given (e.g. {"requiredRevisionId": ...}), it is sent along so the
+        edit is rejected when the document has changed since that revision.
+        """
+        body = {'requests': requests}
+        if write_control:
+            body['writeControl'] = write_control
+        request = self.docs_service.documents().batchUpdate(documentId=document_id, body=body)
+        result = await self._execute(request, self.docs_write_bucket)
+        # The document has a new revision now, so any cached snapshot is stale.
+        self.doc_cache.invalidate(document_id)
+        logger.info(f"Updated document {document_id}")
+        # The full response can be large; it's only formatted when debug logging is on.
+        logger.debug("Update of document %s returned %s", document_id, result)
         return result
 
-    async def read_document(self, document_id: str) -> dict:
-        """Retrieves the entire Google Doc as a JSON structure."""
-        def _get_doc():
-            return self.docs_service.documents().get(documentId=document_id).execute()
-        doc = await asyncio.to_thread(_get_doc)
+    async def read_document(self, document_id: str, fields: str = None) -> dict:
+        """
+        Retrieves the entire Google Doc as a JSON structure.
+        If 'fields' is given, only those parts of the document are returned (a partial response).
+        """
+        request = self.docs_service.documents().get(documentId=document_id, fields=fields)
+        doc = await self._execute(request, self.docs_read_bucket)
+        self.doc_cache.put(document_id, doc)
         logger.info(f"Read document {document_id}")
         return doc
 
@@ -110,22 +323,24 @@ class GoogleDocsService:
         This version strips trailing newline characters from each paragraph so that
         the resulting text matches the inserted content more precisely.
         """
-        content = doc.get('body', {}).get('content', [])
-        paragraphs = []
-        for element in content:
+        # Join paragraphs with a single newline and strip any trailing newline at the end.
+        return "\n".join(self.iter_paragraphs(doc)).rstrip("\n")
+
+    def iter_paragraphs(self, doc: dict):
+        """Yields the plain text of each paragraph in the document's body, without its trailing newlines."""
+        for element in doc.get('body', {}).get('content', []):
             if 'paragraph' in element:
-                para = ''
-                for elem in element['paragraph'].get('elements', []):
-                    if 'textRun' in elem:
-                        para += elem['textRun'].get('content', '')
+                para = "".join(
+                    elem['textRun'].get('content', '')
+                    for elem in element['paragraph'].get('elements', [])
+                    if 'textRun' in elem
+                )
                 # Remove any trailing newlines from the paragraph.
-                paragraphs.append(para.rstrip("\n"))
-        # Join paragraphs with a single newline and strip any trailing newline at the end.
-        return "\n".join(paragraphs).rstrip("\n")
+                yield para.rstrip("\n")
 
     async def read_document_text(self, document_id: str) -> str:
         """Convenience method to get the document text."""
-        doc = await self.read_document(document_id)
+        doc = await self.read_document(document_id, fields=TEXT_FIELDS)
         return self.extract_text(doc)
 
     async def rewrite_document(self, document_id: str, final_text: str) -> dict:
@@ -133,8 +348,49 @@ class GoogleDocsService:
         Rewrites the entire content of the document with the provided final text.
         It deletes the existing content (if any) and then inserts the final text at the start.
         """
-        # First, read the document to determine its current length.
+        # A recent read (e.g. read-doc just before) saves fetching the document again. A snapshot that
+        # looks like a no-op is re-checked against a fresh read, since the document may have changed.
+        cached_doc = self.doc_cache.get(document_id)
+        if cached_doc is not None and cached_doc.get("revisionId") and not self._has_text(cached_doc, final_text):
+            # Make the edit conditional on the cached revision, so a stale snapshot can't
+            # delete the wrong range. Docs rejects a revision mismatch with a 400.
+            write_control = {"requiredRevisionId": cached_doc["revisionId"]}
+            try:
+                return await self.edit_document(
+                    document_id, self._rewrite_requests(cached_doc, final_text), write_control
+                )
+            except HttpError as e:
+                if e.resp.status != 400:
+                    raise
+                logger.info(f"Cached snapshot of document {document_id} is stale, reading it again.")
+                self.doc_cache.invalidate(document_id)
+        # Read the document to determine its current length.
         doc = await self.read_document(document_id)
+        if self._has_text(doc, final_text):
+            # Nothing would change, so don't spend a write (and a round trip) on it.
+            logger.info(f"Document {document_id} already has the requested content.")
+            return {"documentId": document_id, "replies": []}
+        result = await self.edit_document(document_id, self._rewrite_requests(doc, final_text))
+        return result
+
+    def _has_text(self, doc: dict, text: str) -> bool:
+        """Returns True if the document's body is nothing but plain paragraphs whose text is exactly 'text'."""
+        body_content = doc.get("body", {}).get("content", [])
+        runs = []
+        # The first element is the section break every document starts with.
+        for element in body_content[1:]:
+            if 'paragraph' not in element:
+                return False
+            for elem in element['paragraph'].get('elements', []):
+                if 'textRun' not in elem:
+                    return False
+                runs.append(elem['textRun'].get('content', ''))
+        # Compare the raw text rather than extract_text, which drops trailing newlines (and with them
+        # trailing empty paragraphs). Rewriting with 'text' leaves it followed by the body's final newline.
+        return "".join(runs) == text + "\n"
+
+    def _rewrite_requests(self, doc: dict, final_text: str) -> list:
+        """Builds the batchUpdate requests that replace the content of 'doc' with 'final_text'."""
         body_content = doc.get("body", {}).get("content", [])
         # Get the end index from the last element, defaulting to 1 if not found.
         end_index = body_content[-1].get("endIndex", 1) if body_content else 1
@@ -147,60 +403,129 @@ class GoogleDocsService:
                     "range": {"startIndex": 1, "endIndex": end_index - 1}
                 }
             })
-        # Insert the final text at index 1.
-        requests.append({
-            "insertText": {"location": {"index": 1}, "text": final_text}
-        })
-        result = await self.edit_document(document_id, requests)
-        return result
+        # Insert the final text at index 1 (rewriting with "" just clears the document).
+        if final_text:
+            requests.append({
+                "insertText": {"location": {"index": 1}, "text": final_text}
+            })
+        return requests
 
     async def read_comments(self, document_id: str) -> list:
         """Reads comments on the document using the Drive API."""
-        def _list_comments():
-            return self.drive_service.comments().list(
-                fileId=document_id,
-                fields="comments(id,content,author,createdTime,modifiedTime,resolved,replies(content,author,id,createdTime,modifiedTime))"
-            ).execute()
-        response = await asyncio.to_thread(_list_comments)
+        request = self.drive_service.comments().list(
+            fileId=document_id,
+            fields="comments(id,content,author,createdTime,modifiedTime,resolved,replies(content,author,id,createdTime,modifiedTime))"
+        )
+        response = await self._execute(request, self.drive_bucket)
         comments = response.get('comments', [])
         logger.info(f"Retrieved {len(comments)} comments for document {document_id}")
         return comments
 
+    def reply_comment_request(self, document_id: str, comment_id: str, reply_content: str):
+        """Builds the Drive API request that replies to a comment (see reply_comment)."""
+        body = {'content': reply_content}
+        return self.drive_service.replies().create(
+            fileId=document_id,
+            commentId=comment_id,
+            body=body,
+            fields="id,content,author,createdTime,modifiedTime"
+        )
+
     async def reply_comment(self, document_id: str, comment_id: str, reply_content: str) -> dict:
         """Replies to a specific comment on a document using the Drive API."""
-        def _reply():
-            body = {'content': reply_content}
-            return self.drive_service.replies().create(
-                fileId=document_id,
-                commentId=comment_id,
-                body=body,
-                fields="id,content,author,createdTime,modifiedTime"
-            ).execute()
-        reply = await asyncio.to_thread(_reply)
+        request = self.reply_comment_request(document_id, comment_id, reply_content)
+        reply = await self._execute(request, self.drive_bucket)
         logger.info(f"Posted reply to comment {comment_id} in document {document_id}")
         return reply
 
+    def create_comment_request(self, document_id: str, content: str):
+        """Builds the Drive API request that creates a comment (see create_comment)."""
+        body = {"content": content}
+        return self.drive_service.comments().create(
+            fileId=document_id,
+            body=body,
+            fields="id,content,author,createdTime,modifiedTime"
+        )
+
     async def create_comment(self, document_id: str, content: str) -> dict:
         """Creates a comment on the document."""
-        def _create_comment():
-            body = {"content": content}
-            return self.drive_service.comments().create(
-                fileId=document_id,
-                body=body,
-                fields="id,content,author,createdTime,modifiedTime"
-            ).execute()
-        comment = await asyncio.to_thread(_create_comment)
+        request = self.create_comment_request(document_id, content)
+        comment = await self._execute(request, self.drive_bucket)
         logger.info(f"Created comment with ID: {comment.get('id')}")
         return comment
 
+    async def delete_comment(self, document_id: str, comment_id: str) -> dict:
+        """Deletes a comment (and its replies) from a document using the Drive API."""
+        request = self.drive_service.comments().delete(fileId=document_id, commentId=comment_id)
+        result = await self._execute(request, self.drive_bucket)
+        logger.info(f"Deleted comment {comment_id} in document {document_id}")
+        return result
+
+    def delete_reply_request(self, document_id: str, comment_id: str, reply_id: str):
+        """Builds the Drive API request that deletes a reply (see delete_reply)."""
+        return self.drive_service.replies().delete(
+            fileId=document_id,
+            commentId=comment_id,
+            replyId=reply_id
+        )
+
     async def delete_reply(self, document_id: str, comment_id: str, reply_id: str) -> dict:
         """Deletes a reply to a comment in a document using the Drive API."""
-        def _delete_reply():
-            return self.drive_service.replies().delete(
-                fileId=document_id,
-                commentId=comment_id,
-                replyId=reply_id
-            ).execute()
-        result = await asyncio.to_thread(_delete_reply)
+        request = self.delete_reply_request(document_id, comment_id, reply_id)
+        result = await self._execute(request, self.drive_bucket)
         logger.info(f"Deleted reply {reply_id} for comment {comment_id} in document {document_id}")
         return result
+
+    async def execute_drive_batch(self, requests: list) -> list:
+        """
+        Executes several Drive API requests through Drive's multipart batch endpoint
+        (https://www.googleapis.com/batch/drive/v3), DRIVE_BATCH_LIMIT requests per HTTP call.
+
+        Returns one entry per request, in order: its response, or the HttpError it failed with.
+        """
+        results = [None] * len(requests)
+
+        def _callback(request_id, response, exception):
+            results[int(request_id)] = exception if exception is not None else response
+
+        async def _send_batch(indices: list[int]):
+            batch = self.drive_service.new_batch_http_request(callback=_callback)
+            for i in indices:
+                batch.add(requests[i], request_id=str(i))
+            # Every call in a batch counts against the quota on its own.
+            async with rate_limited(self.drive_bucket, len(indices)):
+                await self._run_blocking(batch.execute)
+            # 429s for individual calls come back through the callback rather than as an exception.
+            rate_limited_errors = [
+                results[i] for i in indices
+                if isinstance(results[i], HttpError) and results[i].resp.status == 429
+            ]
+            if rate_limited_errors:
+                self.drive_bucket.throttle(retry_after_seconds(rate_limited_errors[0]))
+
+        async def _execute_chunk(indices: list[int]):
+            # Retry the whole batch if it fails, or just its calls that failed transiently. Any call in
+            # a batch that failed as a whole may have been applied, so that is only retried after a 5xx
+            # if every call in it is idempotent.
+            for attempt in range(MAX_ATTEMPTS):
+                try:
+                    await _send_batch(indices)
+                except HttpError as e:
+                    idempotent = all(is_idempotent(requests[i]) for i in indices)
+                    if not is_retryable(e, idempotent) or attempt == MAX_ATTEMPTS - 1:
+                        raise
+                    error = e
+                else:
+                    indices = [i for i in indices if is_retryable(results[i], is_idempotent(requests[i]))]
+                    if not indices or attempt == MAX_ATTEMPTS - 1:
+                        return
+                    error = results[indices[0]]
+                await asyncio.sleep(backoff_delay(attempt, error))
+
+        # Drive doesn't order calls inside a batch either, so the chunks can go out concurrently.
+        await gather_calls(*(
+            _execute_chunk(list(range(start, min(start + DRIVE_BATCH_LIMIT, len(requests)))))
+            for start in range(0, len(requests), DRIVE_BATCH_LIMIT)
+        ))
+        logger.info(f"Executed batch of {len(requests)} Drive requests")
+        return results
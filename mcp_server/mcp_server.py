@@ -1,7 +1,10 @@
 import os
+import sys
 import argparse
 import asyncio
 import dotenv
+import pydantic_core
+from collections.abc import Awaitable, Callable
 
 # Import MCP server utilities.
 from mcp.server import Server, NotificationOptions
@@ -10,10 +13,356 @@ import mcp.types as types
 import mcp.server.stdio
 
 # Import our updated GoogleDocsService.
-from mcp_server.google_docs_service import GoogleDocsService
+from mcp_server.google_docs_service import GoogleDocsService, insert_texts_requests, replace_text_requests
+from mcp_server.batcher import AsyncBatcher
+from mcp_server.tool_args import (
+    CreateCommentArgs,
+    CreateDocArgs,
+    DeleteReplyArgs,
+    DocumentArgs,
+    InsertTextsArgs,
+    ReplaceTextArgs,
+    ReplyCommentArgs,
+    RewriteDocumentArgs,
+    ToolArgs,
+)
 
 dotenv.load_dotenv()
 
+# The tool list never changes, so it is built once at import time rather than on every list_tools call.
+_TOOLS: list[types.Tool] = [
+    types.Tool(
+        name="create-doc",
+        description="Creates a new Google Doc with an optional title. Optionally, share with your organization by providing a domain and role.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "title": {
+                    "type": "string",
+                    "description": "Title of the new document",
+                    "default": "New Document",
+                    "example": "My New Document"
+                },
+                "org": {
+                    "type": "string",
+                    "description": "Organization domain to share the document with (e.g., 'example.com')",
+                    "example": "example.com"
+                },
+                "role": {
+                    "type": "string",
+                    "description": "Permission role to assign (e.g., 'writer' or 'reader')",
+                    "default": "writer",
+                    "example": "writer"
+                }
+            },
+            "required": []
+        }
+    ),
+    types.Tool(
+        name="rewrite-document",
+        description="Rewrites the entire content of a Google Doc with the provided final text",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_id": {
+                    "type": "string",
+                    "description": "The ID of the Google Document",
+                    "example": "1abcXYZ..."
+                },
+                "final_text": {
+                    "type": "string",
+                    "description": "The final text to replace the document's content",
+                    "example": "This is the new content of the document."
+                },
+                "verbose": {
+                    "type": "boolean",
+                    "description": "Include the full API response in the result",
+                    "default": False
+                }
+            },
+            "required": ["document_id", "final_text"]
+        }
+    ),
+    types.Tool(
+        name="replace-text",
+        description="Replaces every occurrence of a piece of text in a Google Doc",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_id": {
+                    "type": "string",
+                    "description": "The ID of the Google Document",
+                    "example": "1abcXYZ..."
+                },
+                "search_text": {
+                    "type": "string",
+                    "description": "The text to search for",
+                    "example": "old name"
+                },
+                "replace_text": {
+                    "type": "string",
+                    "description": "The text to replace it with",
+                    "example": "new name"
+                },
+                "match_case": {
+                    "type": "boolean",
+                    "description": "Whether the search is case sensitive",
+                    "default": True
+                },
+                "verbose": {
+                    "type": "boolean",
+                    "description": "Include the full API response in the result",
+                    "default": False
+                }
+            },
+            "required": ["document_id", "search_text", "replace_text"]
+        }
+    ),
+    types.Tool(
+        name="insert-texts",
+        description="Inserts several pieces of text into a Google Doc in one request. Every index refers to the document as it is before any of the inserts.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_id": {
+                    "type": "string",
+                    "description": "The ID of the Google Document",
+                    "example": "1abcXYZ..."
+                },
+                "insertions": {
+                    "type": "array",
+                    "description": "The texts to insert and where",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "index": {
+                                "type": "integer",
+                                "description": "Position to insert at (1 is the start of the document)",
+                                "minimum": 1,
+                                "example": 1
+                            },
+                            "text": {
+                                "type": "string",
+                                "description": "The text to insert",
+                                "example": "Hello "
+                            }
+                        },
+                        "required": ["index", "text"]
+                    }
+                },
+                "verbose": {
+                    "type": "boolean",
+                    "description": "Include the full API response in the result",
+                    "default": False
+                }
+            },
+            "required": ["document_id", "insertions"]
+        }
+    ),
+    types.Tool(
+        name="read-comments",
+        description="Reads comments from a Google Doc",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_id": {
+                    "type": "string",
+                    "description": "ID of the document",
+                    "example": "1abcXYZ..."
+                }
+            },
+            "required": ["document_id"]
+        }
+    ),
+    types.Tool(
+        name="reply-comment",
+        description="Replies to a comment in a Google Doc",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_id": {
+                    "type": "string",
+                    "description": "ID of the document",
+                    "example": "1abcXYZ..."
+                },
+                "comment_id": {
+                    "type": "string",
+                    "description": "ID of the comment",
+                    "example": "Cp1..."
+                },
+                "reply": {
+                    "type": "string",
+                    "description": "Content of the reply",
+                    "example": "Thanks for the feedback!"
+                },
+                "verbose": {
+                    "type": "boolean",
+                    "description": "Include the full API response in the result",
+                    "default": False
+                }
+            },
+            "required": ["document_id", "comment_id", "reply"]
+        }
+    ),
+    types.Tool(
+        name="read-doc",
+        description="Reads and returns the plain-text content of a Google Doc",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_id": {
+                    "type": "string",
+                    "description": "ID of the document",
+                    "example": "1abcXYZ..."
+                }
+            },
+            "required": ["document_id"]
+        }
+    ),
+    types.Tool(
+        name="create-comment",
+        description="Creates a new anchored comment on a Google Doc.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_id": {
+                    "type": "string",
+                    "description": "ID of the document",
+                    "example": "1abcXYZ..."
+                },
+                "content": {
+                    "type": "string",
+                    "description": "The text content of the comment",
+                    "example": "This is an anchored comment."
+                },
+                "verbose": {
+                    "type": "boolean",
+                    "description": "Include the full API response in the result",
+                    "default": False
+                }
+            },
+            "required": ["document_id", "content"]
+        }
+    ),
+    types.Tool(
+        name="delete-reply",
+        description="Deletes a reply from a comment in a Google Doc",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_id": {
+                    "type": "string",
+                    "description": "The ID of the Google Document",
+                    "example": "1abcXYZ..."
+                },
+                "comment_id": {
+                    "type": "string",
+                    "description": "The ID of the comment containing the reply",
+                    "example": "Cp1..."
+                },
+                "reply_id": {
+                    "type": "string",
+                    "description": "The ID of the reply to delete",
+                    "example": "reply123"
+                }
+            },
+            "required": ["document_id", "comment_id", "reply_id"]
+        }
+    ),
+]
+
+def _to_json(obj) -> str:
+    """
+    Serializes a Google API response for a tool result (as JSON, not a Python repr).
+    Uses pydantic-core's native encoder, the same one the MCP transport serializes messages with.
+    """
+    return pydantic_core.to_json(obj).decode()
+
+def _result_text(summary: str, result, verbose: bool) -> list[types.TextContent]:
+    """
+    Builds a tool result from a short summary, appending the full API response only if the caller
+    asked for it: the response can be large, and encoding it on every call delays the next one.
+    """
+    if verbose:
+        summary = f"{summary} Result: {_to_json(result)}"
+    return [types.TextContent(type="text", text=summary)]
+
+# Tool handlers. Each takes the shared service, the batcher and the call's validated arguments.
+
+async def _handle_create_doc(docs_service: GoogleDocsService, batcher: AsyncBatcher, args: CreateDocArgs) -> list[types.TextContent]:
+    doc = await docs_service.create_document(args.title, args.org, args.role)
+    return [types.TextContent(
+        type="text",
+        text=f"Document created at URL: https://docs.google.com/document/d/{doc.get('documentId')}/edit"
+    )]
+
+async def _handle_rewrite_document(docs_service: GoogleDocsService, batcher: AsyncBatcher, args: RewriteDocumentArgs) -> list[types.TextContent]:
+    result = await docs_service.rewrite_document(args.document_id, args.final_text)
+    return _result_text(f"Document {args.document_id} rewritten with new content.", result, args.verbose)
+
+async def _handle_replace_text(docs_service: GoogleDocsService, batcher: AsyncBatcher, args: ReplaceTextArgs) -> list[types.TextContent]:
+    # Without match_case, replacing a text with itself can still change its case (e.g. "Apple" -> "apple").
+    if args.match_case and args.search_text == args.replace_text:
+        return [types.TextContent(type="text", text=f"No-op: nothing to replace in document {args.document_id}.")]
+    # Concurrent edits of the same document go out together, in order, as one batchUpdate.
+    result = await batcher.submit(
+        args.document_id, "docs", replace_text_requests(args.search_text, args.replace_text, args.match_case)
+    )
+    replies = result.get("replies") or [{}]
+    occurrences = replies[0].get("replaceAllText", {}).get("occurrencesChanged", 0)
+    return _result_text(
+        f"Replaced {occurrences} occurrence(s) of the text in document {args.document_id}.", result, args.verbose
+    )
+
+async def _handle_insert_texts(docs_service: GoogleDocsService, batcher: AsyncBatcher, args: InsertTextsArgs) -> list[types.TextContent]:
+    requests = insert_texts_requests([(insertion.index, insertion.text) for insertion in args.insertions])
+    if not requests:
+        return [types.TextContent(type="text", text=f"No-op: nothing to insert into document {args.document_id}.")]
+    result = await batcher.submit(args.document_id, "docs", requests)
+    return _result_text(f"Inserted {len(requests)} text(s) into document {args.document_id}.", result, args.verbose)
+
+async def _handle_read_comments(docs_service: GoogleDocsService, batcher: AsyncBatcher, args: DocumentArgs) -> list[types.TextContent]:
+    comments = await docs_service.read_comments(args.document_id)
+    return [types.TextContent(type="text", text=_to_json(comments))]
+
+async def _handle_reply_comment(docs_service: GoogleDocsService, batcher: AsyncBatcher, args: ReplyCommentArgs) -> list[types.TextContent]:
+    result = await batcher.submit(
+        args.document_id, "drive", docs_service.reply_comment_request(args.document_id, args.comment_id, args.reply)
+    )
+    return _result_text(f"Reply {result.get('id')} posted to comment {args.comment_id}.", result, args.verbose)
+
+async def _handle_read_doc(docs_service: GoogleDocsService, batcher: AsyncBatcher, args: DocumentArgs) -> list[types.TextContent]:
+    text = await docs_service.read_document_text(args.document_id)
+    return [types.TextContent(type="text", text=text)]
+
+async def _handle_create_comment(docs_service: GoogleDocsService, batcher: AsyncBatcher, args: CreateCommentArgs) -> list[types.TextContent]:
+    comment = await batcher.submit(
+        args.document_id, "drive", docs_service.create_comment_request(args.document_id, args.content)
+    )
+    return _result_text(f"Comment {comment.get('id')} created on document {args.document_id}.", comment, args.verbose)
+
+async def _handle_delete_reply(docs_service: GoogleDocsService, batcher: AsyncBatcher, args: DeleteReplyArgs) -> list[types.TextContent]:
+    await batcher.submit(
+        args.document_id, "drive", docs_service.delete_reply_request(args.document_id, args.comment_id, args.reply_id)
+    )
+    return [types.TextContent(
+        type="text",
+        text=f"Deleted reply {args.reply_id} from comment {args.comment_id} in document {args.document_id}."
+    )]
+
+# Maps each tool name (see _TOOLS) to its argument model and handler.
+_HANDLERS: dict[str, tuple[type[ToolArgs], Callable[..., Awaitable[list[types.TextContent]]]]] = {
+    "create-doc": (CreateDocArgs, _handle_create_doc),
+    "rewrite-document": (RewriteDocumentArgs, _handle_rewrite_document),
+    "replace-text": (ReplaceTextArgs, _handle_replace_text),
+    "insert-texts": (InsertTextsArgs, _handle_insert_texts),
+    "read-comments": (DocumentArgs, _handle_read_comments),
+    "reply-comment": (ReplyCommentArgs, _handle_reply_comment),
+    "read-doc": (DocumentArgs, _handle_read_doc),
+    "create-comment": (CreateCommentArgs, _handle_create_comment),
+    "delete-reply": (DeleteReplyArgs, _handle_delete_reply),
+}
+
 async def run_main(creds_file_path: str, token_path: str):
     # Convert relative paths to absolute paths.
     creds_file_path = os.path.abspath(creds_file_path)
@@ -21,224 +370,39 @@ async def run_main(creds_file_path: str, token_path: str):
 
     # Instantiate the service.
     docs_service = GoogleDocsService(creds_file_path, token_path)
+    # Coalesces concurrent edits/comment calls on the same document into batched requests.
+    batcher = AsyncBatcher(docs_service)
     server = Server("googledocs")
 
     @server.list_tools()
     async def handle_list_tools() -> list[types.Tool]:
-        return [
-            types.Tool(
-                name="create-doc",
-                description="Creates a new Google Doc with an optional title. Optionally, share with your organization by providing a domain and role.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "title": {
-                            "type": "string",
-                            "description": "Title of the new document",
-                            "default": "New Document",
-                            "example": "My New Document"
-                        },
-                        "org": {
-                            "type": "string",
-                            "description": "Organization domain to share the document with (e.g., 'example.com')",
-                            "example": "example.com"
-                        },
-                        "role": {
-                            "type": "string",
-                            "description": "Permission role to assign (e.g., 'writer' or 'reader')",
-                            "default": "writer",
-                            "example": "writer"
-                        }
-                    },
-                    "required": []
-                }
-            ),
-            types.Tool(
-                name="rewrite-document",
-                description="Rewrites the entire content of a Google Doc with the provided final text",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "document_id": {
-                            "type": "string",
-                            "description": "The ID of the Google Document",
-                            "example": "1abcXYZ..."
-                        },
-                        "final_text": {
-                            "type": "string",
-                            "description": "The final text to replace the document's content",
-                            "example": "This is the new content of the document."
-                        }
-                    },
-                    "required": ["document_id", "final_text"]
-                }
-            ),
-            types.Tool(
-                name="read-comments",
-                description="Reads comments from a Google Doc",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "document_id": {
-                            "type": "string",
-                            "description": "ID of the document",
-                            "example": "1abcXYZ..."
-                        }
-                    },
-                    "required": ["document_id"]
-                }
-            ),
-            types.Tool(
-                name="reply-comment",
-                description="Replies to a comment in a Google Doc",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "document_id": {
-                            "type": "string",
-                            "description": "ID of the document",
-                            "example": "1abcXYZ..."
-                        },
-                        "comment_id": {
-                            "type": "string",
-                            "description": "ID of the comment",
-                            "example": "Cp1..."
-                        },
-                        "reply": {
-                            "type": "string",
-                            "description": "Content of the reply",
-                            "example": "Thanks for the feedback!"
-                        }
-                    },
-                    "required": ["document_id", "comment_id", "reply"]
-                }
-            ),
-            types.Tool(
-                name="read-doc",
-                description="Reads and returns the plain-text content of a Google Doc",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "document_id": {
-                            "type": "string",
-                            "description": "ID of the document",
-                            "example": "1abcXYZ..."
-                        }
-                    },
-                    "required": ["document_id"]
-                }
-            ),
-            types.Tool(
-                name="create-comment",
-                description="Creates a new anchored comment on a Google Doc.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "document_id": {
-                            "type": "string",
-                            "description": "ID of the document",
-                            "example": "1abcXYZ..."
-                        },
-                        "content": {
-                            "type": "string",
-                            "description": "The text content of the comment",
-                            "example": "This is an anchored comment."
-                        }
-                    },
-                    "required": ["document_id", "content"]
-                }
-            ),
-            types.Tool(
-                name="delete-reply",
-                description="Deletes a reply from a comment in a Google Doc",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "document_id": {
-                            "type": "string",
-                            "description": "The ID of the Google Document",
-                            "example": "1abcXYZ..."
-                        },
-                        "comment_id": {
-                            "type": "string",
-                            "description": "The ID of the comment containing the reply",
-                            "example": "Cp1..."
-                        },
-                        "reply_id": {
-                            "type": "string",
-                            "description": "The ID of the reply to delete",
-                            "example": "reply123"
-                        }
-                    },
-                    "required": ["document_id", "comment_id", "reply_id"]
-                }
-            ),
-        ]
+        return _TOOLS
 
     @server.call_tool()
     async def handle_call_tool(name: str, arguments: dict | None) -> list[types.TextContent]:
-        if name == "create-doc":
-            title = arguments.get("title", "New Document")
-            # Retrieve optional parameters for org and role.
-            org = arguments.get("org")
-            role = arguments.get("role", "writer")
-            doc = await docs_service.create_document(title, org, role)
-            return [types.TextContent(
-                type="text",
-                text=f"Document created at URL: https://docs.google.com/document/d/{doc.get('documentId')}/edit"
-            )]
-        elif name == "rewrite-document":
-            document_id = arguments["document_id"]
-            final_text = arguments["final_text"]
-            result = await docs_service.rewrite_document(document_id, final_text)
-            return [types.TextContent(
-                type="text",
-                text=f"Document {document_id} rewritten with new content. Result: {result}"
-            )]
-        elif name == "read-comments":
-            document_id = arguments["document_id"]
-            comments = await docs_service.read_comments(document_id)
-            return [types.TextContent(type="text", text=str(comments))]
-        elif name == "reply-comment":
-            document_id = arguments["document_id"]
-            comment_id = arguments["comment_id"]
-            reply = arguments["reply"]
-            result = await docs_service.reply_comment(document_id, comment_id, reply)
-            return [types.TextContent(type="text", text=f"Reply posted: {result}")]
-        elif name == "read-doc":
-            document_id = arguments["document_id"]
-            text = await docs_service.read_document_text(document_id)
-            return [types.TextContent(type="text", text=text)]
-        elif name == "create-comment":
-            document_id = arguments["document_id"]
-            content = arguments["content"]
-            comment = await docs_service.create_comment(document_id, content)
-            return [types.TextContent(type="text", text=f"Comment created: {comment}")]
-        elif name == "delete-reply":
-            document_id = arguments["document_id"]
-            comment_id = arguments["comment_id"]
-            reply_id = arguments["reply_id"]
-            await docs_service.delete_reply(document_id, comment_id, reply_id)
-            return [types.TextContent(
-                type="text",
-                text=f"Deleted reply {reply_id} from comment {comment_id} in document {document_id}."
-            )]
-        else:
+        entry = _HANDLERS.get(name)
+        if entry is None:
             raise ValueError(f"Unknown tool: {name}")
+        args_model, handler = entry
+        # A ValidationError is reported to the client as a failed tool call.
+        return await handler(docs_service, batcher, args_model.model_validate(arguments or {}))
 
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="googledocs",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={}
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="googledocs",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={}
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        docs_service.close()
 
 def main():
     """
@@ -263,7 +427,15 @@ def main():
     args = parser.parse_args()
     if not args.creds_file_path or not args.token_path:
         parser.error("You must supply --creds-file-path and --token-path, or set GOOGLE_CREDS_FILE and GOOGLE_TOKEN_FILE environment variables.")
-    asyncio.run(run_main(args.creds_file_path, args.token_path))
+    # Use uvloop's faster event loop when it is installed (it doesn't support Windows).
+    loop_factory = None
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            loop_factory = uvloop.new_event_loop
+        except ImportError:
+            pass
+    asyncio.run(run_main(args.creds_file_path, args.token_path), loop_factory=loop_factory)
 
 if __name__ == "__main__":
     main()
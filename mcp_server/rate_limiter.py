@@ -0,0 +1,76 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+from googleapiclient.errors import HttpError
+
+# After a 429 the rate is halved; it then climbs back to the configured rate over this many seconds.
+RECOVERY_SECONDS = 60
+
+class AsyncTokenBucket:
+    """
+    Client-side token bucket used to stay under a Google API quota.
+
+    Tokens refill continuously at `rate` per second, up to `capacity`. acquire() waits (without
+    blocking the event loop) until enough tokens are available, serving callers in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.max_rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.rate = min(self.max_rate, self.rate + elapsed * self.max_rate / RECOVERY_SECONDS)
+        self.updated_at = now
+
+    async def acquire(self, n: float = 1):
+        n = min(n, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < n:
+                await asyncio.sleep((n - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= n
+
+    def throttle(self, retry_after: float | None = None):
+        """
+        Slows the bucket down after Google answered 429: halves the rate and, if the server
+        sent a Retry-After, holds back every caller until it has passed.
+        """
+        self._refill()
+        self.rate = max(self.max_rate / 10, self.rate / 2)
+        if retry_after:
+            self.tokens = min(self.tokens, -retry_after * self.rate)
+
+def retry_after_seconds(error: HttpError) -> float | None:
+    """Returns the Retry-After delay of an HttpError in seconds, if the server sent one."""
+    value = error.resp.get('retry-after') if error.resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+@asynccontextmanager
+async def rate_limited(bucket: AsyncTokenBucket, n: float = 1):
+    """Acquires n tokens before the wrapped call and throttles the bucket if the call hits a 429."""
+    await bucket.acquire(n)
+    try:
+        yield
+    except HttpError as e:
+        if e.resp.status == 429:
+            bucket.throttle(retry_after_seconds(e))
+        raise
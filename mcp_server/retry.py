@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import random
+
+from googleapiclient.errors import HttpError
+
+from mcp_server.rate_limiter import retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+# Statuses Google documents as transient: rate limiting and server-side errors.
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+# A 429 means the call was rejected before it ran, so any call can be retried after one. After a
+# server-side error the call may have been applied anyway, so only idempotent calls are retried.
+RATE_LIMITED_STATUS = 429
+# HTTP methods that have the same effect however many times they are sent (RFC 9110).
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+# Total number of tries for a call, including the first one.
+MAX_ATTEMPTS = 5
+
+def is_idempotent(request) -> bool:
+    """Returns True if the googleapiclient request can safely be sent again after a server-side error."""
+    return request.method.upper() in IDEMPOTENT_METHODS
+
+def is_retryable(error: BaseException, idempotent: bool = True) -> bool:
+    """
+    Returns True if the call that failed with 'error' should be retried: on a 429 always,
+    on a transient server-side error only if the call is idempotent.
+    """
+    if not isinstance(error, HttpError) or error.resp.status not in RETRYABLE_STATUSES:
+        return False
+    return idempotent or error.resp.status == RATE_LIMITED_STATUS
+
+def backoff_delay(attempt: int, error: HttpError, base: float = 0.2, cap: float = 8.0) -> float:
+    """
+    Seconds to wait before retrying after the given (0-based) attempt failed: the server's
+    Retry-After if it sent one, otherwise capped exponential backoff plus random jitter.
+    """
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        return retry_after
+    return min(cap, base * 2 ** attempt) + random.uniform(0, base)
+
+async def with_retry(coro_factory, *, idempotent: bool = True, max_attempts: int = MAX_ATTEMPTS,
+                     base: float = 0.2, cap: float = 8.0):
+    """
+    Awaits coro_factory() and retries transient Google API failures (see is_retryable),
+    sleeping without blocking the event loop in between. Other errors are raised immediately.
+    Pass idempotent=False for calls that must not be repeated after a server-side error.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return await coro_factory()
+        except HttpError as e:
+            if not is_retryable(e, idempotent) or attempt == max_attempts - 1:
+                raise
+            delay = backoff_delay(attempt, e, base, cap)
+            logger.info(f"Google API call failed with {e.resp.status}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
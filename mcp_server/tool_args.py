@@ -0,0 +1,47 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+class ToolArgs(BaseModel):
+    """
+    Base class for tool arguments. Arguments are validated once on entry, so malformed calls
+    fail before any request is sent to Google. Unknown arguments are ignored.
+    """
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+class CreateDocArgs(ToolArgs):
+    title: str = "New Document"
+    org: str | None = None
+    role: str = "writer"
+
+class DocumentArgs(ToolArgs):
+    document_id: str
+
+class VerboseArgs(ToolArgs):
+    # Whether to include the full Google API response in the result; by default it is a short summary.
+    verbose: bool = False
+
+class RewriteDocumentArgs(DocumentArgs, VerboseArgs):
+    final_text: str
+
+class ReplaceTextArgs(DocumentArgs, VerboseArgs):
+    search_text: str = Field(min_length=1)
+    replace_text: str
+    match_case: bool = True
+
+class TextInsertion(ToolArgs):
+    # Index 0 is the start of the body's section break; text can only go at 1 or later.
+    index: int = Field(ge=1)
+    text: str
+
+class InsertTextsArgs(DocumentArgs, VerboseArgs):
+    insertions: list[TextInsertion]
+
+class ReplyCommentArgs(DocumentArgs, VerboseArgs):
+    comment_id: str
+    reply: str
+
+class CreateCommentArgs(DocumentArgs, VerboseArgs):
+    content: str
+
+class DeleteReplyArgs(DocumentArgs):
+    comment_id: str
+    reply_id: str
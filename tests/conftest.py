@@ -0,0 +1,103 @@
+import os
+import asyncio
+import time
+import pytest
+import dotenv
+import pytest_asyncio
+
+dotenv.load_dotenv()
+
+from mcp_server.google_docs_service import GoogleDocsService, gather_calls
+
+# Shared fixtures, so the service (credentials, token refresh, API clients) is set up once per session.
+
+# Number of documents created once per session and handed out to tests through temp_document and clean_doc.
+DOC_POOL_SIZE = 3
+# Seconds a test waits for a pooled document before failing, so a pool that has lost its documents
+# fails the suite instead of hanging it. Long enough to cover another test's retried reset.
+DOC_POOL_TIMEOUT = 60
+
+# Async fixtures for credentials and token file paths.
+@pytest_asyncio.fixture(scope="session")
+def creds_file_path():
+    path = os.environ.get("GOOGLE_CREDS_FILE")
+    if not path:
+        pytest.skip("GOOGLE_CREDS_FILE environment variable not set")
+    return path
+
+@pytest_asyncio.fixture(scope="session")
+def token_file_path():
+    path = os.environ.get("GOOGLE_TOKEN_FILE")
+    if not path:
+        pytest.skip("GOOGLE_TOKEN_FILE environment variable not set")
+    return path
+
+@pytest_asyncio.fixture(scope="session")
+def docs_service(creds_file_path, token_file_path):
+    service = GoogleDocsService(creds_file_path, token_file_path)
+    yield service
+    service.close()
+
+# Pool of documents shared by the tests, created up front and deleted together at the end of the session.
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def document_pool(docs_service):
+    session_title = f"Integration Test Doc {os.getpid()} {int(time.time())}"
+    docs = await gather_calls(*(
+        docs_service.create_document(f"{session_title} #{i}") for i in range(DOC_POOL_SIZE)
+    ))
+    document_ids = [doc.get("documentId") for doc in docs]
+    if not all(document_ids):
+        pytest.fail("Failed to create document.")
+    pool = asyncio.Queue()
+    for document_id in document_ids:
+        pool.put_nowait(document_id)
+    yield pool
+    results = await asyncio.gather(*(
+        docs_service.delete_document(document_id) for document_id in document_ids
+    ), return_exceptions=True)
+    for document_id, result in zip(document_ids, results):
+        if isinstance(result, BaseException):
+            print(f"Warning: Failed to delete document {document_id}: {result!r}")
+
+# Cleanup calls (deleting documents and comments) that tests start in the background rather than
+# waiting on; they are awaited together at the end of the session. It depends on document_pool so
+# it is torn down first, before the pooled documents the comments live on are deleted.
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def pending_deletes(docs_service, document_pool):
+    tasks: list[asyncio.Task] = []
+    yield tasks
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Report every failure, not only API errors: a task may also have been cancelled or hit a network error.
+    for result in results:
+        if isinstance(result, BaseException):
+            print(f"Warning: Background cleanup failed: {result!r}")
+
+# Helper that takes a document out of the pool, failing the test if none is returned in time.
+async def borrow_document(document_pool: asyncio.Queue) -> str:
+    try:
+        return await asyncio.wait_for(document_pool.get(), DOC_POOL_TIMEOUT)
+    except TimeoutError:
+        pytest.fail(f"No pooled document became available within {DOC_POOL_TIMEOUT}s.")
+
+# Fixture that lends a document from the pool to a test that leaves its content unchanged.
+@pytest_asyncio.fixture
+async def temp_document(document_pool):
+    document_id = await borrow_document(document_pool)
+    try:
+        yield document_id
+    finally:
+        document_pool.put_nowait(document_id)
+
+# Fixture that lends a document from the pool to a test that edits it and empties it again afterward,
+# so every pooled document is handed out empty.
+@pytest_asyncio.fixture
+async def clean_doc(docs_service, document_pool):
+    document_id = await borrow_document(document_pool)
+    try:
+        yield document_id
+    finally:
+        try:
+            await docs_service.rewrite_document(document_id, "")
+        finally:
+            # Return the document even if the reset failed, so the pool never runs dry.
+            document_pool.put_nowait(document_id)
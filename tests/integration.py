@@ -1,103 +1,67 @@
 import os
 import re
 import asyncio
+import random
 import time
 import pytest
-import dotenv
-from googleapiclient.errors import HttpError
-import pytest_asyncio
 
-dotenv.load_dotenv()
+from mcp_server.google_docs_service import insert_texts_requests, replace_text_requests
 
-from mcp_server.google_docs_service import GoogleDocsService
+# Run every test and fixture on one session-wide event loop, so session fixtures (the service and
+# its asyncio locks, the document pool) are shared across tests.
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+_NEWLINE_RE = re.compile(r'\n+')
 
 # Helper function to normalize text by collapsing multiple newlines.
 def normalize_text(text: str) -> str:
-    return re.sub(r'\n+', '\n', text).strip()
-
-# Async fixtures for credentials and token file paths.
-@pytest_asyncio.fixture(scope="session")
-def creds_file_path():
-    path = os.environ.get("GOOGLE_CREDS_FILE")
-    if not path:
-        pytest.skip("GOOGLE_CREDS_FILE environment variable not set")
-    return path
-
-@pytest_asyncio.fixture(scope="session")
-def token_file_path():
-    path = os.environ.get("GOOGLE_TOKEN_FILE")
-    if not path:
-        pytest.skip("GOOGLE_TOKEN_FILE environment variable not set")
-    return path
-
-@pytest_asyncio.fixture(scope="session")
-def docs_service(creds_file_path, token_file_path):
-    service = GoogleDocsService(creds_file_path, token_file_path)
-    return service
+    return _NEWLINE_RE.sub('\n', text).strip()
 
-# Fixture to create a temporary document and clean it up afterward.
-@pytest_asyncio.fixture
-async def temp_document(docs_service):
-    unique_title = f"Integration Test Doc {int(time.time())}"
-    doc = await docs_service.create_document(unique_title)
-    document_id = doc.get("documentId")
-    if not document_id:
-        pytest.fail("Failed to create document.")
-    yield document_id
-    try:
-        await asyncio.to_thread(
-            lambda: docs_service.drive_service.files().delete(fileId=document_id).execute()
-        )
-    except HttpError as e:
-        print(f"Warning: Failed to delete document {document_id}: {e}")
+# Helper that creates a comment for a test to work with and returns its ID.
+async def create_test_comment(docs_service, document_id: str, content: str) -> str:
+    comment = await docs_service.create_comment(document_id, content)
+    comment_id = comment.get("id")
+    assert comment_id, "A comment should have been created."
+    return comment_id
 
 # Test: Create a new document.
-@pytest.mark.asyncio
-async def test_create_document(docs_service):
-    title = f"Integration Create Doc Test {int(time.time())}"
+async def test_create_document(docs_service, pending_deletes):
+    title = f"Integration Create Doc Test {os.getpid()} {int(time.time())}"
     doc = await docs_service.create_document(title)
     document_id = doc.get("documentId")
     assert document_id, "Document ID should be returned on creation."
-    read_doc = await docs_service.read_document(document_id)
-    assert "body" in read_doc, "Document should contain a body."
+    # documents.create returns the whole new document, so there's no need to read it back.
+    assert "body" in doc, "Document should contain a body."
     # Clean up.
-    await asyncio.to_thread(
-        lambda: docs_service.drive_service.files().delete(fileId=document_id).execute()
-    )
+    pending_deletes.append(asyncio.create_task(docs_service.delete_document(document_id)))
 
 # Test: Create a document and share with datastax.com
-@pytest.mark.asyncio
-async def test_create_document_with_org(docs_service):
-    title = f"Integration Create Doc with Org Test {int(time.time())}"
+async def test_create_document_with_org(docs_service, pending_deletes):
+    title = f"Integration Create Doc with Org Test {os.getpid()} {int(time.time())}"
     org = "datastax.com"
     # Create the document with org share enabled.
     doc = await docs_service.create_document(title, org, "writer")
     document_id = doc.get("documentId")
     assert document_id, "Document ID should be returned on creation with org sharing."
-    # Give the permission a moment to propagate.
-    await asyncio.sleep(1)
-    # Retrieve the document's permissions.
-    permissions = await asyncio.to_thread(
-        lambda: docs_service.drive_service.permissions().list(
-            fileId=document_id,
-            fields="permissions(id, domain, role, type)"
-        ).execute()
-    )
-    # Look for a domain-level permission for datastax.com.
-    domain_perms = [
-        perm for perm in permissions.get("permissions", [])
-        if perm.get("type") == "domain" and perm.get("domain") == org
-    ]
+    # Poll the document's permissions for a domain-level one for datastax.com, backing off (with
+    # jitter) while it propagates instead of always waiting out a fixed delay. The jitter only
+    # lengthens the delays, so the last poll still comes at least 1.55s in (more than the old 1s sleep).
+    for delay in (0.05, 0.1, 0.2, 0.4, 0.8, None):
+        permissions = await docs_service.list_permissions(document_id)
+        domain_perms = [
+            perm for perm in permissions
+            if perm.get("type") == "domain" and perm.get("domain") == org
+        ]
+        if domain_perms or delay is None:
+            break
+        await asyncio.sleep(delay * random.uniform(1.0, 1.5))
     assert domain_perms, f"Document should have domain permission for {org}."
     # Clean up.
-    await asyncio.to_thread(
-        lambda: docs_service.drive_service.files().delete(fileId=document_id).execute()
-    )
+    pending_deletes.append(asyncio.create_task(docs_service.delete_document(document_id)))
 
 # Test: Rewrite the document content.
-@pytest.mark.asyncio
-async def test_rewrite_document(temp_document, docs_service):
-    document_id = temp_document
+async def test_rewrite_document(clean_doc, docs_service):
+    document_id = clean_doc
     final_text = (
         "This is the new final content of the document.\n"
         "It has multiple lines.\n"
@@ -117,35 +81,46 @@ async def test_rewrite_document(temp_document, docs_service):
         f"Expected: {normalized_expected}, but got: {normalized_actual}"
     )
 
+# Test: Replace every occurrence of a piece of text.
+async def test_replace_text(clean_doc, docs_service):
+    document_id = clean_doc
+    # Pooled documents start out empty, so the setup insert and the replace can go out as one
+    # batchUpdate; its requests are applied in order.
+    result = await docs_service.edit_document(document_id, [
+        {"insertText": {"location": {"index": 1}, "text": "apple banana apple"}},
+        *replace_text_requests("apple", "cherry"),
+    ])
+    # The reply reports how many occurrences were replaced, so there's no need to read the text back.
+    assert result["replies"][1]["replaceAllText"]["occurrencesChanged"] == 2
+
+# Test: Insert several texts in one request, with indices relative to the original document.
+async def test_insert_texts(clean_doc, docs_service):
+    document_id = clean_doc
+    # Set up "ac" in the same batchUpdate: "a" is at index 1 and "c" at index 2.
+    await docs_service.edit_document(document_id, [
+        {"insertText": {"location": {"index": 1}, "text": "ac"}},
+        *insert_texts_requests([(1, "<"), (2, "b"), (3, ">")]),
+    ])
+    text = await docs_service.read_document_text(document_id)
+    assert text == "<abc>", f"Unexpected text after inserts: {text}"
+
 # Test: Read document text.
-@pytest.mark.asyncio
 async def test_read_document_text(temp_document, docs_service):
     document_id = temp_document
     text = await docs_service.read_document_text(document_id)
     assert isinstance(text, str), "Document text should be a string"
 
 # Test: Read comments (even if none exist, should return a list).
-@pytest.mark.asyncio
 async def test_read_comments(temp_document, docs_service):
     document_id = temp_document
     comments = await docs_service.read_comments(document_id)
     assert isinstance(comments, list), "Comments should be returned as a list"
 
 # Test: Reply to a comment.
-@pytest.mark.asyncio
-async def test_reply_comment(temp_document, docs_service):
+async def test_reply_comment(temp_document, docs_service, pending_deletes):
     document_id = temp_document
     # Create a comment.
-    def create_comment():
-        body = {"content": "Integration test comment"}
-        return docs_service.drive_service.comments().create(
-            fileId=document_id,
-            body=body,
-            fields="id,content"
-        ).execute()
-    comment = await asyncio.to_thread(create_comment)
-    comment_id = comment.get("id")
-    assert comment_id, "A comment should have been created."
+    comment_id = await create_test_comment(docs_service, document_id, "Integration test comment")
 
     # Post a reply.
     reply_text = "Integration test reply"
@@ -153,45 +128,24 @@ async def test_reply_comment(temp_document, docs_service):
     assert reply_text in reply_result.get("content", ""), "The reply should be posted."
 
     # Clean up: Delete the comment.
-    def delete_comment():
-        return docs_service.drive_service.comments().delete(
-            fileId=document_id,
-            commentId=comment_id
-        ).execute()
-    await asyncio.to_thread(delete_comment)
+    pending_deletes.append(asyncio.create_task(docs_service.delete_comment(document_id, comment_id)))
 
 # Test: Create a comment.
-@pytest.mark.asyncio
-async def test_create_comment(temp_document, docs_service):
+async def test_create_comment(temp_document, docs_service, pending_deletes):
     document_id = temp_document
     content = "Test create comment"
     comment = await docs_service.create_comment(document_id, content)
     assert "id" in comment, "Created comment should have an ID."
 
     # Clean up: Delete the comment.
-    def delete_comment():
-        return docs_service.drive_service.comments().delete(
-            fileId=document_id,
-            commentId=comment.get("id")
-        ).execute()
-    await asyncio.to_thread(delete_comment)
+    pending_deletes.append(asyncio.create_task(docs_service.delete_comment(document_id, comment.get("id"))))
 
 # Test: Delete a reply.
-@pytest.mark.asyncio
-async def test_delete_reply(temp_document, docs_service):
+async def test_delete_reply(temp_document, docs_service, pending_deletes):
     document_id = temp_document
 
     # Create a comment.
-    def create_comment():
-        body = {"content": "Test comment for delete reply"}
-        return docs_service.drive_service.comments().create(
-            fileId=document_id,
-            body=body,
-            fields="id,content,replies"
-        ).execute()
-    comment = await asyncio.to_thread(create_comment)
-    comment_id = comment.get("id")
-    assert comment_id, "A comment should have been created for delete reply test."
+    comment_id = await create_test_comment(docs_service, document_id, "Test comment for delete reply")
 
     # Create a reply for the comment.
     reply_text = "Test reply to be deleted"
@@ -210,48 +164,4 @@ async def test_delete_reply(temp_document, docs_service):
             assert all(r.get("id") != reply_id for r in replies), "The reply should have been deleted."
 
     # Clean up: Delete the comment.
-    def delete_comment():
-        return docs_service.drive_service.comments().delete(
-            fileId=document_id,
-            commentId=comment_id
-        ).execute()
-    await asyncio.to_thread(delete_comment)
-
-
-@pytest.mark.asyncio
-async def test_write_and_read_doc():
-    """
-    Integration test for creating a Google Doc, rewriting its content,
-    and reading back the text to confirm the update.
-    """
-    creds_file_path = os.environ.get("GOOGLE_CREDS_FILE")
-    token_file = os.environ.get("GOOGLE_TOKEN_FILE")
-
-    # Skip test if credentials are not set.
-    if not creds_file_path or not token_file:
-        pytest.skip("Environment variables GOOGLE_CREDS_FILE and GOOGLE_TOKEN_FILE must be set for integration tests.")
-
-    # Instantiate the GoogleDocsService.
-    service = GoogleDocsService(creds_file_path, token_file)
-
-    # Create a new document with a test title.
-    doc = await service.create_document(title="Integration Test Document")
-    document_id = doc.get("documentId")
-    assert document_id, "Document creation failed; no documentId returned."
-
-    # Define the test content.
-    test_content = "Hello, this is an integration test \nfor rewriting and reading a Google Doc!"
-
-    # Rewrite the document with the test content.
-    rewrite_result = await service.rewrite_document(document_id, test_content)
-
-    # Read the document's text back.
-    read_back_text = await service.read_document_text(document_id)
-
-    # Verify that the new content appears in the document.
-    assert test_content in read_back_text, (
-        f"Expected content not found in document. Read content: {read_back_text}"
-    )
-
-    # Optionally, print the document URL for manual inspection.
-    print(f"Test document URL: https://docs.google.com/document/d/{document_id}/edit")
+    pending_deletes.append(asyncio.create_task(docs_service.delete_comment(document_id, comment_id)))
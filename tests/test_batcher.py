@@ -0,0 +1,100 @@
+import asyncio
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from mcp_server.batcher import AsyncBatcher
+
+def http_error(status: int) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), b"")
+
+class FakeDocsService:
+    """Records the calls the batcher makes; each Docs reply names the request it answers."""
+
+    def __init__(self, error: HttpError = None):
+        self.edits = []
+        self.drive_batches = []
+        self.error = error
+
+    async def edit_document(self, document_id: str, requests: list) -> dict:
+        self.edits.append((document_id, requests))
+        if self.error is not None and (len(requests) > 1 or "bad" in requests):
+            raise self.error
+        return {"documentId": document_id, "replies": [{"request": request} for request in requests]}
+
+    async def execute_drive_batch(self, requests: list) -> list:
+        self.drive_batches.append(requests)
+        return [{"response": request} for request in requests]
+
+# Test: Concurrent edits of a document go out as one batchUpdate, and each caller gets its own replies.
+@pytest.mark.asyncio
+async def test_docs_ops_share_one_call():
+    service = FakeDocsService()
+    batcher = AsyncBatcher(service, max_wait_ms=10)
+    first, second = await asyncio.gather(
+        batcher.submit("doc", "docs", ["a", "b"]),
+        batcher.submit("doc", "docs", ["c"]),
+    )
+    assert service.edits == [("doc", ["a", "b", "c"])]
+    assert first["replies"] == [{"request": "a"}, {"request": "b"}]
+    assert second["replies"] == [{"request": "c"}]
+
+# Test: A queue is flushed as soon as it holds max_batch operations, without waiting for the timer.
+@pytest.mark.asyncio
+async def test_flushes_on_max_batch():
+    service = FakeDocsService()
+    batcher = AsyncBatcher(service, max_wait_ms=60_000, max_batch=2)
+    await asyncio.wait_for(asyncio.gather(
+        batcher.submit("doc", "docs", ["a"]),
+        batcher.submit("doc", "docs", ["b"]),
+    ), timeout=1)
+    assert service.edits == [("doc", ["a", "b"])]
+
+# Test: A queue that never fills up is flushed once max_wait_ms has passed.
+@pytest.mark.asyncio
+async def test_flushes_on_timer():
+    service = FakeDocsService()
+    batcher = AsyncBatcher(service, max_wait_ms=10, max_batch=50)
+    result = await asyncio.wait_for(batcher.submit("doc", "docs", ["a"]), timeout=1)
+    assert result["replies"] == [{"request": "a"}]
+
+# Test: Operations are batched separately per document and per API.
+@pytest.mark.asyncio
+async def test_batches_per_document_and_api():
+    service = FakeDocsService()
+    batcher = AsyncBatcher(service, max_wait_ms=10)
+    _, _, drive_result = await asyncio.gather(
+        batcher.submit("doc1", "docs", ["a"]),
+        batcher.submit("doc2", "docs", ["b"]),
+        batcher.submit("doc1", "drive", "comment"),
+    )
+    assert sorted(service.edits) == [("doc1", ["a"]), ("doc2", ["b"])]
+    assert service.drive_batches == [["comment"]]
+    assert drive_result == {"response": "comment"}
+
+# Test: When Docs rejects a batch as invalid (400), each op is replayed alone so only its caller fails.
+@pytest.mark.asyncio
+async def test_replays_ops_individually_after_400():
+    service = FakeDocsService(error=http_error(400))
+    batcher = AsyncBatcher(service, max_wait_ms=10)
+    good, bad = await asyncio.gather(
+        batcher.submit("doc", "docs", ["good"]),
+        batcher.submit("doc", "docs", ["bad"]),
+        return_exceptions=True,
+    )
+    assert good["replies"] == [{"request": "good"}]
+    assert isinstance(bad, HttpError) and bad.resp.status == 400
+    assert service.edits == [("doc", ["good", "bad"]), ("doc", ["good"]), ("doc", ["bad"])]
+
+# Test: Any other failure is shared by every caller and not replayed, so no op can be applied twice.
+@pytest.mark.asyncio
+async def test_does_not_replay_after_server_error():
+    service = FakeDocsService(error=http_error(503))
+    batcher = AsyncBatcher(service, max_wait_ms=10)
+    results = await asyncio.gather(
+        batcher.submit("doc", "docs", ["a"]),
+        batcher.submit("doc", "docs", ["b"]),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, HttpError) and result.resp.status == 503 for result in results)
+    assert service.edits == [("doc", ["a", "b"])]
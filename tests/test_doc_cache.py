@@ -0,0 +1,26 @@
+import time
+
+from mcp_server.doc_cache import DocCache
+
+# Test: A snapshot is served until it is invalidated.
+def test_get_put_invalidate():
+    cache = DocCache(ttl=30)
+    assert cache.get("doc") is None
+    snapshot = {"documentId": "doc", "revisionId": "rev1"}
+    cache.put("doc", snapshot)
+    assert cache.get("doc") is snapshot
+    cache.invalidate("doc")
+    assert cache.get("doc") is None
+    # Invalidating a document that isn't cached is a no-op.
+    cache.invalidate("other")
+
+# Test: A snapshot older than the TTL is no longer served.
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = DocCache(ttl=30)
+    cache.put("doc", {"documentId": "doc"})
+    now[0] += 29
+    assert cache.get("doc") is not None
+    now[0] += 1
+    assert cache.get("doc") is None
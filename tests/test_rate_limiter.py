@@ -0,0 +1,73 @@
+import time
+from email.utils import formatdate
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from mcp_server.rate_limiter import AsyncTokenBucket, rate_limited, retry_after_seconds
+
+def http_error(status: int, retry_after: str = None) -> HttpError:
+    headers = {"status": status}
+    if retry_after is not None:
+        headers["retry-after"] = retry_after
+    return HttpError(httplib2.Response(headers), b"")
+
+# Test: Calls within the bucket's capacity go through right away; the next one waits for a refill.
+@pytest.mark.asyncio
+async def test_acquire_waits_once_tokens_run_out():
+    bucket = AsyncTokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert time.monotonic() - start < 0.02, "Tokens within capacity should be granted immediately."
+    await bucket.acquire()
+    # One token refills in 1 / 20 s.
+    assert time.monotonic() - start >= 0.04, "The third call should have waited for a token."
+
+# Test: A 429 halves the rate, but never below a tenth of the configured rate.
+def test_throttle_halves_rate_with_floor():
+    bucket = AsyncTokenBucket(rate=10, capacity=10)
+    bucket.throttle()
+    assert bucket.rate == pytest.approx(5, rel=0.01)
+    for _ in range(10):
+        bucket.throttle()
+    assert bucket.rate == pytest.approx(1, rel=0.01)
+
+# Test: After a throttle the rate climbs back to the configured rate over time.
+def test_rate_recovers_after_throttle(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    bucket = AsyncTokenBucket(rate=10, capacity=10)
+    bucket.throttle()
+    now[0] += 15
+    bucket._refill()
+    # A quarter of RECOVERY_SECONDS recovers a quarter of the configured rate.
+    assert bucket.rate == pytest.approx(7.5)
+    now[0] += 60
+    bucket._refill()
+    assert bucket.rate == pytest.approx(10), "The rate should never climb above the configured rate."
+
+# Test: A Retry-After holds back the next caller until it has passed.
+@pytest.mark.asyncio
+async def test_throttle_honors_retry_after():
+    bucket = AsyncTokenBucket(rate=10, capacity=10)
+    bucket.throttle(retry_after=0.2)
+    start = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - start >= 0.2
+
+# Test: rate_limited throttles the bucket when the wrapped call hits a 429, and re-raises it.
+@pytest.mark.asyncio
+async def test_rate_limited_throttles_on_429():
+    bucket = AsyncTokenBucket(rate=10, capacity=10)
+    with pytest.raises(HttpError):
+        async with rate_limited(bucket):
+            raise http_error(429)
+    assert bucket.rate == pytest.approx(5, rel=0.01)
+
+# Test: Retry-After is understood both as seconds and as an HTTP date.
+def test_retry_after_seconds():
+    assert retry_after_seconds(http_error(429, "3")) == 3
+    assert retry_after_seconds(http_error(429, formatdate(time.time() + 60, usegmt=True))) == pytest.approx(60, abs=2)
+    assert retry_after_seconds(http_error(429)) is None
+    assert retry_after_seconds(http_error(429, "soon")) is None
@@ -0,0 +1,34 @@
+import pytest
+
+from mcp_server.mcp_server import _handle_replace_text
+from mcp_server.tool_args import ReplaceTextArgs
+
+class FakeBatcher:
+    """Records the ops submitted to it and answers each replaceAllText with one changed occurrence."""
+
+    def __init__(self):
+        self.submitted = []
+
+    async def submit(self, document_id: str, api: str, op):
+        self.submitted.append((document_id, api, op))
+        return {"documentId": document_id, "replies": [{"replaceAllText": {"occurrencesChanged": 1}}]}
+
+# Test: Replacing a text with itself, matching case, changes nothing and sends nothing.
+@pytest.mark.asyncio
+async def test_same_text_matching_case_is_a_no_op():
+    batcher = FakeBatcher()
+    args = ReplaceTextArgs(document_id="doc", search_text="apple", replace_text="apple")
+    result = await _handle_replace_text(None, batcher, args)
+    assert batcher.submitted == []
+    assert result[0].text.startswith("No-op")
+
+# Test: Without match_case the same text still replaces differently-cased occurrences, so it is sent.
+@pytest.mark.asyncio
+async def test_same_text_ignoring_case_is_sent():
+    batcher = FakeBatcher()
+    args = ReplaceTextArgs(document_id="doc", search_text="apple", replace_text="apple", match_case=False)
+    result = await _handle_replace_text(None, batcher, args)
+    assert batcher.submitted == [("doc", "docs", [{
+        "replaceAllText": {"containsText": {"text": "apple", "matchCase": False}, "replaceText": "apple"}
+    }])]
+    assert result[0].text == "Replaced 1 occurrence(s) of the text in document doc."
@@ -0,0 +1,50 @@
+import asyncio
+import functools
+import time
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from mcp_server.retry import with_retry
+
+def unavailable(retry_after: str) -> HttpError:
+    return HttpError(httplib2.Response({"status": 503, "retry-after": retry_after}), b"")
+
+# Test: Backoff between retries sleeps without blocking the event loop, so concurrent retries overlap.
+@pytest.mark.asyncio
+async def test_concurrent_retries_overlap():
+    attempts = []
+
+    async def flaky_call(call_id: int):
+        attempts.append(call_id)
+        if attempts.count(call_id) == 1:
+            # The first attempt of every call gets a 503 asking for a 0.5 s backoff.
+            raise unavailable("0.5")
+        return call_id
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(
+        with_retry(functools.partial(flaky_call, call_id)) for call_id in range(10)
+    ))
+    elapsed = time.monotonic() - start
+
+    assert results == list(range(10))
+    assert len(attempts) == 20, "Every call should have been retried once."
+    # Ten blocking 0.5 s sleeps would take 5 s.
+    assert elapsed < 1, f"Retries should back off concurrently, but took {elapsed:.2f}s"
+
+# Test: A write that isn't idempotent is retried after a 429, but not after a 5xx it may have been applied despite.
+@pytest.mark.asyncio
+async def test_non_idempotent_call_only_retries_rate_limits():
+    errors = [HttpError(httplib2.Response({"status": 429, "retry-after": "0"}), b""), unavailable("0")]
+    attempts = 0
+
+    async def create_call():
+        nonlocal attempts
+        attempts += 1
+        raise errors[attempts - 1]
+
+    with pytest.raises(HttpError) as exc_info:
+        await with_retry(create_call, idempotent=False)
+    assert exc_info.value.resp.status == 503
+    assert attempts == 2, "The 429 should have been retried and the 503 raised."
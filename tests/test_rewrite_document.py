@@ -0,0 +1,130 @@
+import json
+import httplib2
+import pytest
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+
+from mcp_server.google_docs_service import GoogleDocsService
+
+DOCUMENT_ID = "doc"
+
+def make_doc(text: str, revision: str = "rev1") -> dict:
+    """Builds a documents.get response for a document holding one plain paragraph of 'text'."""
+    return {
+        "documentId": DOCUMENT_ID,
+        "revisionId": revision,
+        "body": {"content": [
+            # Every document starts with a section break.
+            {"endIndex": 1, "sectionBreak": {}},
+            {"endIndex": len(text) + 2, "paragraph": {"elements": [{"textRun": {"content": text + "\n"}}]}},
+        ]},
+    }
+
+class FakeDocsApi:
+    """Stands in for GoogleDocsService._execute: serves one document and records the calls made."""
+
+    def __init__(self, doc: dict):
+        self.doc = doc
+        self.calls = []
+        self.batch_update_error = None
+
+    async def __call__(self, request, bucket):
+        body = json.loads(request.body) if request.body else None
+        self.calls.append((request.methodId, body))
+        if request.methodId == "docs.documents.get":
+            return self.doc
+        if self.batch_update_error is not None:
+            error, self.batch_update_error = self.batch_update_error, None
+            raise error
+        return {"documentId": DOCUMENT_ID, "replies": [{} for _ in body["requests"]]}
+
+    def methods(self) -> list[str]:
+        return [method for method, _ in self.calls]
+
+@pytest.fixture
+def docs_api():
+    return FakeDocsApi(make_doc("old text"))
+
+# A real service with placeholder credentials whose API calls go to docs_api instead of Google.
+@pytest.fixture
+def service(monkeypatch, docs_api):
+    monkeypatch.setattr(GoogleDocsService, "_get_credentials", lambda self, *args: Credentials("token"))
+    service = GoogleDocsService("credentials.json", "token.json")
+    monkeypatch.setattr(service, "_execute", docs_api)
+    yield service
+    service.close()
+
+# Test: Without a cached snapshot, the document is read and then rewritten unconditionally.
+@pytest.mark.asyncio
+async def test_rewrite_reads_document_first(service, docs_api):
+    await service.rewrite_document(DOCUMENT_ID, "new text")
+    assert docs_api.methods() == ["docs.documents.get", "docs.documents.batchUpdate"]
+    _, body = docs_api.calls[1]
+    assert "writeControl" not in body
+    assert body["requests"] == [
+        {"deleteContentRange": {"range": {"startIndex": 1, "endIndex": 9}}},
+        {"insertText": {"location": {"index": 1}, "text": "new text"}},
+    ]
+
+# Test: A rewrite right after a read uses the cached snapshot, conditional on its revision.
+@pytest.mark.asyncio
+async def test_rewrite_uses_cached_snapshot(service, docs_api):
+    await service.read_document(DOCUMENT_ID)
+    await service.rewrite_document(DOCUMENT_ID, "new text")
+    assert docs_api.methods() == ["docs.documents.get", "docs.documents.batchUpdate"]
+    _, body = docs_api.calls[1]
+    assert body["writeControl"] == {"requiredRevisionId": "rev1"}
+    # The edit made the snapshot stale.
+    assert service.doc_cache.get(DOCUMENT_ID) is None
+
+# Test: If the document changed since the cached snapshot (a 400), it is read again and rewritten.
+@pytest.mark.asyncio
+async def test_rewrite_falls_back_when_snapshot_is_stale(service, docs_api):
+    await service.read_document(DOCUMENT_ID)
+    docs_api.batch_update_error = HttpError(httplib2.Response({"status": 400}), b"")
+    await service.rewrite_document(DOCUMENT_ID, "new text")
+    assert docs_api.methods() == [
+        "docs.documents.get", "docs.documents.batchUpdate", "docs.documents.get", "docs.documents.batchUpdate",
+    ]
+    _, retried_body = docs_api.calls[3]
+    assert "writeControl" not in retried_body
+
+# Test: Rewriting a document with the text it already has reads it but doesn't spend a write.
+@pytest.mark.asyncio
+async def test_rewrite_with_same_text_is_a_no_op(service, docs_api):
+    result = await service.rewrite_document(DOCUMENT_ID, "old text")
+    assert docs_api.methods() == ["docs.documents.get"]
+    assert result == {"documentId": DOCUMENT_ID, "replies": []}
+
+# Test: A cached snapshot that looks like a no-op is checked against a fresh read before skipping the write.
+@pytest.mark.asyncio
+async def test_no_op_is_checked_against_fresh_read(service, docs_api):
+    await service.read_document(DOCUMENT_ID)
+    # The document changed after it was cached.
+    docs_api.doc = make_doc("edited elsewhere", revision="rev2")
+    await service.rewrite_document(DOCUMENT_ID, "old text")
+    assert docs_api.methods() == ["docs.documents.get", "docs.documents.get", "docs.documents.batchUpdate"]
+
+# Test: Content other than plain paragraphs (e.g. a table) means the document isn't a no-op, even if its text matches.
+@pytest.mark.asyncio
+async def test_non_text_content_is_rewritten(service, docs_api):
+    docs_api.doc["body"]["content"].append({"endIndex": 20, "table": {}})
+    await service.rewrite_document(DOCUMENT_ID, "old text")
+    assert docs_api.methods() == ["docs.documents.get", "docs.documents.batchUpdate"]
+
+# Test: Clearing a document that is already empty sends nothing.
+@pytest.mark.asyncio
+async def test_clearing_empty_document_is_a_no_op(service, docs_api):
+    docs_api.doc = make_doc("")
+    await service.rewrite_document(DOCUMENT_ID, "")
+    assert docs_api.methods() == ["docs.documents.get"]
+
+# Test: A trailing empty paragraph is part of the text, so it's only a no-op for text ending in a newline.
+@pytest.mark.asyncio
+async def test_trailing_empty_paragraph_counts_as_text(service, docs_api):
+    docs_api.doc["body"]["content"].append({"endIndex": 11, "paragraph": {"elements": [{"textRun": {"content": "\n"}}]}})
+    await service.rewrite_document(DOCUMENT_ID, "old text")
+    assert docs_api.methods() == ["docs.documents.get", "docs.documents.batchUpdate"]
+    docs_api.calls.clear()
+    await service.rewrite_document(DOCUMENT_ID, "old text\n")
+    assert docs_api.methods() == ["docs.documents.get"]